@@ -6,21 +6,44 @@ Innovation: Uses graph morphological properties to create self-authenticating si
 Author : Diego Morales Magri - October 2025
 """
 
+from __future__ import annotations
+
 import random
 import hashlib
-import numpy as np
-import networkx as nx
-from typing import Tuple, Dict, List
-# Ajout pour HKDF
-from cryptography.hazmat.primitives.kdf.hkdf import HKDF
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.backends import default_backend
+from typing import TYPE_CHECKING, Tuple, Dict, List, Optional
+
+# NumPy and the cryptography HKDF stack are imported lazily inside the methods
+# that need them, so that `import ORCP` stays cheap for short-lived processes
+# (CLI tools, verification workers, IoT devices) that only generate motifs.
+if TYPE_CHECKING:
+    import numpy as np
+
+# Public key derivation modes
+#   'canonical' (default): versioned byte-level encoding of the invariants
+#   'legacy'             : original str()-based derivation, for keys issued before
+KEY_DERIVATIONS = ('canonical', 'legacy')
+KEY_DERIVATION_VERSION = 1
+KEY_DERIVATION_DOMAIN = b'ORCP-PK' + bytes([KEY_DERIVATION_VERSION])
+FIXED_POINT_SCALE = 10**8  # invariants are compared at 1e-8 precision
 
 class ORCP:
-    def __init__(self, vertices=14):  # Optimized for 14 vertices
+    def __init__(self, vertices=14, key_derivation='canonical', invariant_cache=None):  # Optimized for 14 vertices
+        if key_derivation not in KEY_DERIVATIONS:
+            raise ValueError(f"Unknown key derivation {key_derivation!r}, expected one of {KEY_DERIVATIONS}")
+        if key_derivation == 'legacy' and invariant_cache is not None:
+            # Legacy keys hash str() of the floats, and cached invariants differ
+            # from a member's own in the last bits, so keys would not match
+            raise ValueError("An invariant cache cannot be used with the legacy key derivation")
         self.vertices = vertices
+        self.key_derivation = key_derivation
+        # Optional orcp_isomorphism.InvariantCache: isomorphic graphs then share
+        # the invariants computed on their class's canonical representative
+        # (canonical key derivation only). Key generation only: verification
+        # always recomputes the invariants from the pattern
+        self.invariant_cache = invariant_cache
         self.edges = vertices * (vertices - 1) // 2
         self.total_bits = vertices + self.edges
+        self._edge_positions = None  # upper-triangle indices, built on first use
         
     def generate_motif(self) -> str:
         """Generates a random binary pattern"""
@@ -33,101 +56,204 @@ class ORCP:
         vertices = {pos: motif[pos] for pos in vertex_positions}
         
     # Create adjacency matrix with remaining bits
-        adj_matrix = np.zeros((self.vertices, self.vertices), dtype=int)
-        edge_index = self.vertices  # Start after vertices
-        
-        for i in range(self.vertices):
-            for j in range(i + 1, self.vertices):
-                if edge_index < len(motif):
-                    adj_matrix[i][j] = int(motif[edge_index])
-                    adj_matrix[j][i] = adj_matrix[i][j]  # Symmetric
-                    edge_index += 1
+        adj_matrix = self._adjacency_matrices([motif])[0]
         
         return vertices, adj_matrix
     
+    def _adjacency_matrices(self, motifs: List[str]) -> np.ndarray:
+        """Builds the (batch, n, n) stack of adjacency matrices of the patterns"""
+        import numpy as np
+        # Edge bits follow the vertex bits, upper triangle row by row;
+        # missing bits of a short pattern are absent edges
+        edge_bits = ''.join(motif[self.vertices:self.total_bits].ljust(self.edges, '0') for motif in motifs)
+        bits = (np.frombuffer(edge_bits.encode(), dtype=np.uint8) - ord('0')).reshape(len(motifs), self.edges)
+        if (bits > 1).any():  # Characters below '0' wrap around to large values
+            raise ValueError("Pattern must only contain '0' and '1'")
+        if self._edge_positions is None:
+            self._edge_positions = np.triu_indices(self.vertices, 1)
+        rows, cols = self._edge_positions
+        adj_stack = np.zeros((len(motifs), self.vertices, self.vertices), dtype=int)
+        adj_stack[:, rows, cols] = bits
+        adj_stack[:, cols, rows] = bits  # Symmetric
+        return adj_stack
+    
     def calculate_morphological_signature(self, vertices: Dict, adj_matrix: np.ndarray) -> int:
         """Calculates the morphological signature of the graph"""
-        signature = 0
-        vertex_positions = list(vertices.keys())
-        
-        for i in range(adj_matrix.shape[0]):
-            degree = sum(adj_matrix[i])
-            bit_value = int(vertices[vertex_positions[i]])
-            signature += degree * bit_value
-        
-        return signature
+        import numpy as np
+        bit_values = np.array([int(vertices[pos]) for pos in vertices], dtype=int)
+        return adj_matrix.sum(axis=1) @ bit_values
     
     def generate_self_verifiable_key(self, motif: str) -> Tuple[str, Dict]:
         """Generates a self-verifiable key without external public key"""
-        vertices, adj_matrix = self.create_graph_from_motif(motif)
-        morph_signature = self.calculate_morphological_signature(vertices, adj_matrix)
+        return self.generate_self_verifiable_keys([motif])[0]
+    
+    def generate_self_verifiable_keys(self, motifs: List[str]) -> List[Tuple[str, Dict]]:
+        """Generates the self-verifiable keys of a batch of patterns
+
+        Every step runs over the whole batch as NumPy array operations (which
+        release the GIL); per-pattern Python work is limited to one SHA-256
+        call for the graph hash and one for the key, so threads share the work.
+        """
+        invariants = self._compute_invariants(motifs)
+        records = self._verification_records(invariants)
+    # The "public key" is now derived from the graph properties
+        if self.key_derivation == 'legacy':
+            return [(self._derive_public_key_legacy(data), data) for data in records]
+        return list(zip(self._derive_public_keys(invariants), records))
+    
+    def _compute_invariants(self, motifs: List[str], use_cache: bool = True) -> Dict[str, np.ndarray]:
+        """Computes the graph properties of a batch of patterns, as arrays"""
+        import numpy as np
+        adj_stack = self._adjacency_matrices(motifs)
+        labels = np.frombuffer(''.join(motif[:self.vertices] for motif in motifs).encode(),
+                               dtype=np.uint8).reshape(len(motifs), self.vertices)
+        if ((labels - ord('0')) > 1).any():
+            raise ValueError("Pattern must only contain '0' and '1'")
+        degrees = adj_stack.sum(axis=2)
         
-    # INNOVATION 1: Deterministic graph hash as "public fingerprint"
-        graph_hash = self._compute_graph_hash(adj_matrix, vertices)
+        if self.invariant_cache is None or not use_cache:
+            spectral_signatures, degree_sequences, clustering_coeffs = self._isomorphism_invariants(adj_stack)
+        else:
+            cached = self.invariant_cache.get_or_compute(adj_stack, self._isomorphism_invariants)
+            spectral_signatures = np.array([record[0] for record in cached]).reshape(len(motifs), self.vertices)
+            degree_sequences = np.array([record[1] for record in cached], dtype=int).reshape(len(motifs), self.vertices)
+            clustering_coeffs = np.array([record[2] for record in cached], dtype=float)
         
+        return {
+    # INNOVATION 1: Deterministic graph hash as "public fingerprint"
+            'graph_hash': self._hash_graphs(adj_stack, labels),
+            'spectral_signature': spectral_signatures,
+            'degree_sequence': degree_sequences,
+            'clustering_coeff': clustering_coeffs,
+            'morph_signature': (degrees * (labels - ord('0'))).sum(axis=1),
+            'edges_count': adj_stack.sum(axis=(1, 2)) // 2
+        }
+    
+    def _verification_records(self, invariants: Dict[str, np.ndarray]) -> List[Dict]:
+        """Splits batch invariants into one verification_data dict per pattern"""
+        graph_hashes = invariants['graph_hash'].tobytes().hex()
+        spectral_signatures = invariants['spectral_signature']
+        degree_sequences = invariants['degree_sequence']
+        clustering_coeffs = invariants['clustering_coeff'].tolist()
+        morph_signatures = invariants['morph_signature']
+        edges_counts = invariants['edges_count']
+        return [
+            {
+                'graph_hash': graph_hashes[16 * b:16 * (b + 1)],
+                'spectral_signature': list(spectral_signatures[b]),
+                'degree_sequence': list(degree_sequences[b]),
+                'clustering_coeff': clustering_coeffs[b],
+                'morph_signature': morph_signatures[b],
+                'vertices_count': self.vertices,
+                'edges_count': edges_counts[b]
+            }
+            for b in range(len(clustering_coeffs))
+        ]
+    
+    def _isomorphism_invariants(self, adj_stack: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Spectral signatures, sorted degree sequences and clustering coefficients of a stack"""
+        import numpy as np
     # INNOVATION 2: Key derived with self-verifiable properties
     # Uses mathematical properties of the graph to create a key
     # that contains its own verification information
-        eigenvalues = np.linalg.eigvals(adj_matrix.astype(float))
-        spectral_signature = [round(x, 8) for x in sorted(eigenvalues.real)]
+        spectral_signatures = self._spectral_signatures(adj_stack)
         
     # INNOVATION 3: Integrated signature using graph invariants
     # Topological invariants that do not change under isomorphism
-        degree_sequence = sorted([sum(adj_matrix[i]) for i in range(self.vertices)])
-        clustering_coeff = self._calculate_clustering_coefficient(adj_matrix)
-        
-    # Create the self-verifiable key
-        verification_data = {
-            'graph_hash': graph_hash,
-            'spectral_signature': spectral_signature,
-            'degree_sequence': degree_sequence,
-            'clustering_coeff': clustering_coeff,
-            'morph_signature': morph_signature,
-            'vertices_count': self.vertices,
-            'edges_count': np.sum(adj_matrix) // 2
-        }
-        
-    # The "public key" is now derived from the graph properties
-        public_key = self._derive_public_key(verification_data)
-        
-        return public_key, verification_data
+        degree_sequences = np.sort(adj_stack.sum(axis=2), axis=1)
+        clustering_coeffs = self._clustering_coefficients(adj_stack)
+        return spectral_signatures, degree_sequences, clustering_coeffs
+    
+    def _spectral_signatures(self, adj_stack: np.ndarray) -> np.ndarray:
+        """Sorted real parts of the eigenvalues, rounded to 8 decimals, per graph"""
+        import numpy as np
+        eigenvalues = np.linalg.eigvals(adj_stack.astype(float))
+        return np.round(np.sort(eigenvalues.real, axis=-1), 8)
     
     def _compute_graph_hash(self, adj_matrix: np.ndarray, vertices: Dict) -> str:
         """Computes a canonical hash of the graph"""
-        # Create a canonical representation of the graph
-        # Adjacency matrix in binary format, concatenated row by row
-        adj_bin = ''.join(''.join(str(int(bit)) for bit in row) for row in adj_matrix)
+        import numpy as np
         # Ordered vertex labels
         labels = ''.join(str(vertices[i]) for i in range(self.vertices))
-        # Canonical representation
-        graph_repr = adj_bin + labels
-        return hashlib.sha256(graph_repr.encode()).hexdigest()[:16]
+        return self._hash_graphs(adj_matrix[None], np.frombuffer(labels.encode(), dtype=np.uint8)[None]).tobytes().hex()
+    
+    def _hash_graphs(self, adj_stack: np.ndarray, labels: np.ndarray) -> np.ndarray:
+        """Truncated (8-byte) SHA-256 graph hashes of a stack, as a (batch, 8) array"""
+        import numpy as np
+        # Canonical representation: adjacency matrix as '0'/'1' characters,
+        # concatenated row by row, followed by the ordered vertex labels
+        messages = np.concatenate([(adj_stack.astype(np.uint8) + ord('0')).reshape(len(adj_stack), self.vertices * self.vertices), labels], axis=1)
+        digests = b''.join(hashlib.sha256(message).digest()[:8] for message in messages)
+        return np.frombuffer(digests, dtype=np.uint8).reshape(len(adj_stack), 8)
     
     def _calculate_clustering_coefficient(self, adj_matrix: np.ndarray) -> float:
         """Calculates the average clustering coefficient"""
-        n = adj_matrix.shape[0]
-        clustering_sum = 0
-        
+        return self._clustering_coefficients(adj_matrix[None]).tolist()[0]
+    
+    def _clustering_coefficients(self, adj_stack: np.ndarray) -> np.ndarray:
+        """Average clustering coefficient of each graph of a (batch, n, n) stack"""
+        import numpy as np
+        n = adj_stack.shape[1]
+        adj = adj_stack.astype(float)
+        # Edges between the neighbours of each vertex (triangles through it)
+        actual_edges = ((adj @ adj) * adj).sum(axis=2) / 2
+        degrees = adj.sum(axis=2)
+        possible_edges = degrees * (degrees - 1) / 2
+        ratios = np.divide(actual_edges, possible_edges, out=np.zeros_like(degrees), where=degrees >= 2)
+        # Accumulate column by column, in vertex order, so each result is
+        # bit-identical to a sequential per-vertex sum
+        clustering_sum = np.zeros(len(adj_stack))
         for i in range(n):
-            neighbors = [j for j in range(n) if adj_matrix[i][j] == 1]
-            if len(neighbors) < 2:
-                continue
-            
-            possible_edges = len(neighbors) * (len(neighbors) - 1) // 2
-            actual_edges = 0
-            
-            for u in neighbors:
-                for v in neighbors:
-                    if u < v and adj_matrix[u][v] == 1:
-                        actual_edges += 1
-            
-            if possible_edges > 0:
-                clustering_sum += actual_edges / possible_edges
-        
-        return clustering_sum / n if n > 0 else 0
+            clustering_sum = clustering_sum + ratios[:, i]
+        return clustering_sum / n if n > 0 else clustering_sum
     
     def _derive_public_key(self, verification_data: Dict) -> str:
         """Derives a public key from the graph properties"""
+        import numpy as np
+        if self.key_derivation == 'legacy':
+            return self._derive_public_key_legacy(verification_data)
+        invariants = {
+            'graph_hash': np.frombuffer(bytes.fromhex(verification_data['graph_hash']), dtype=np.uint8)[None],
+            'spectral_signature': np.array([verification_data['spectral_signature']], dtype=float),
+            'degree_sequence': np.array([verification_data['degree_sequence']], dtype=int),
+            'clustering_coeff': np.array([verification_data['clustering_coeff']], dtype=float),
+            'morph_signature': np.array([verification_data['morph_signature']], dtype=int)
+        }
+        return self._derive_public_keys(invariants, verification_data['vertices_count'])[0]
+    
+    def _derive_public_keys(self, invariants: Dict[str, np.ndarray], vertices_count: int = None) -> List[str]:
+        """Canonical public keys of a batch of invariants
+
+        Fixed-width little-endian encoding of the invariants (floats as 1e-8
+        fixed point) hashed with SHA-256, so keys do not depend on Python/NumPy
+        reprs. The encoding of the whole batch is built with array operations.
+        """
+        import numpy as np
+        batch, n = invariants['spectral_signature'].shape
+        layout = np.dtype([
+            ('domain', 'u1', (len(KEY_DERIVATION_DOMAIN),)),
+            ('vertices_count', '<u2'),
+            ('spectral_count', '<u2'),
+            ('spectral_signature', '<i8', (n,)),
+            ('degree_sequence', '<u2', (n,)),
+            ('clustering_coeff', '<i8'),
+            ('morph_signature', '<u8'),
+            ('graph_hash', 'u1', (8,))
+        ])
+        encoded = np.empty(batch, dtype=layout)
+        encoded['domain'] = np.frombuffer(KEY_DERIVATION_DOMAIN, dtype=np.uint8)
+        encoded['vertices_count'] = self.vertices if vertices_count is None else vertices_count
+        encoded['spectral_count'] = n
+        encoded['spectral_signature'] = np.rint(invariants['spectral_signature'] * FIXED_POINT_SCALE).astype('<i8')
+        encoded['degree_sequence'] = invariants['degree_sequence']
+        encoded['clustering_coeff'] = np.rint(invariants['clustering_coeff'] * FIXED_POINT_SCALE).astype('<i8')
+        encoded['morph_signature'] = invariants['morph_signature']
+        encoded['graph_hash'] = invariants['graph_hash']
+        messages = encoded.view(np.uint8).reshape(batch, layout.itemsize)
+        return [hashlib.sha256(message).hexdigest()[:32] for message in messages]  # 32-character hex public keys
+
+    def _derive_public_key_legacy(self, verification_data: Dict) -> str:
+        """Legacy derivation hashing str() of the invariants (repr-dependent)"""
         # Concatenate all important properties
         key_components = [
             str(verification_data['spectral_signature']),
@@ -141,30 +267,6 @@ class ORCP:
         key_hash = hashlib.sha256(combined.encode()).hexdigest()
         
         return key_hash[:32]  # 32-character hex public key
-        
-        def generate_self_verifiable_key(self, motif: str) -> Tuple[str, Dict]:
-            """Génère une clé auto-vérifiable avec invariants strictement normalisés"""
-            vertices, adj_matrix = self.create_graph_from_motif(motif)
-            morph_signature = self.calculate_morphological_signature(vertices, adj_matrix)
-            graph_hash = self._compute_graph_hash(adj_matrix, vertices)
-            # Spectral signature : valeurs propres triées, arrondies à 8 décimales
-            eigenvalues = np.linalg.eigvals(adj_matrix.astype(float))
-            spectral_sorted = sorted(eigenvalues.real)
-            # Séquence des degrés triée
-            degree_sequence = sorted([sum(adj_matrix[i]) for i in range(self.vertices)])
-            # Coefficient de clustering arrondi à 8 décimales
-            clustering_coeff = round(self._calculate_clustering_coefficient(adj_matrix), 8)
-            verification_data = {
-                'graph_hash': graph_hash,
-                'spectral_signature': spectral_sorted,
-                'degree_sequence': degree_sequence,
-                'clustering_coeff': clustering_coeff,
-                'morph_signature': morph_signature,
-                'vertices_count': self.vertices,
-                'edges_count': int(np.sum(adj_matrix) // 2)
-            }
-            public_key = self._derive_public_key(verification_data)
-            return public_key, verification_data
     
     def create_shared_key(self, my_public_key: str, other_public_key: str, use_hkdf: bool = True, salt: bytes = b"", info: bytes = b"orcp-shared-key") -> str:
         """Creates a shared key from public keys, using HKDF (default) or XOR (legacy)."""
@@ -173,6 +275,9 @@ class ORCP:
     # Common input: concatenation of both public keys (canonical order)
         concat = my_bytes + other_bytes if my_bytes < other_bytes else other_bytes + my_bytes
         if use_hkdf:
+            from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+            from cryptography.hazmat.primitives import hashes
+            from cryptography.hazmat.backends import default_backend
             # Uses HKDF-SHA256 to derive the shared key (32 bytes)
             hkdf = HKDF(
                 algorithm=hashes.SHA256(),
@@ -191,38 +296,80 @@ class ORCP:
     def verify_signature_without_public_key(self, motif: str, signature_data: Dict) -> bool:
         """INNOVATION: Verifies a signature without needing the public key"""
         try:
-            # Recreate the graph from the pattern
-            vertices, adj_matrix = self.create_graph_from_motif(motif)
-            
-            # Recalculate all properties
-            computed_morph_sig = self.calculate_morphological_signature(vertices, adj_matrix)
-            computed_graph_hash = self._compute_graph_hash(adj_matrix, vertices)
-            computed_eigenvalues = np.linalg.eigvals(adj_matrix.astype(float))
-            computed_spectral_sorted = [round(x, 8) for x in sorted(computed_eigenvalues.real)]
-            computed_degree_seq = sorted([sum(adj_matrix[i]) for i in range(self.vertices)])
-            computed_clustering = self._calculate_clustering_coefficient(adj_matrix)
-            
-            # Check internal consistency
-            # Element-wise comparison for spectral signature
-            spectral_ok = (
-                len(computed_spectral_sorted) == len(signature_data['spectral_signature']) and
-                all(abs(a - b) < 1e-8 for a, b in zip(computed_spectral_sorted, signature_data['spectral_signature']))
-            )
-            checks = [
-                computed_morph_sig == signature_data['morph_signature'],
-                computed_graph_hash == signature_data['graph_hash'],
-                spectral_ok,
-                computed_degree_seq == signature_data['degree_sequence'],
-                abs(computed_clustering - signature_data['clustering_coeff']) < 1e-8,
-                signature_data['vertices_count'] == self.vertices,
-                signature_data['edges_count'] == int(np.sum(adj_matrix) // 2)
-            ]
-            return all(checks)
+            # Recreate the graph from the pattern and recalculate all properties
+            computed = self._verification_records(self._compute_invariants([motif], use_cache=False))[0]
+            return self._signature_matches(computed, signature_data)
             
         except Exception as e:
             print(f"Verification error: {e}")
             return False
     
+    def verify_signatures_without_public_key(self, motifs: List[str], signatures: List[Dict]) -> List[bool]:
+        """Verifies a batch of signatures, computing and comparing the invariants batch-wise"""
+        try:
+            invariants = self._compute_invariants(motifs, use_cache=False)
+        except Exception:
+            # A malformed pattern in the batch: fall back to one-by-one checks
+            return [self.verify_signature_without_public_key(m, s) for m, s in zip(motifs, signatures)]
+        results = self._signatures_match(invariants, signatures)
+        if results is not None:
+            return results
+        # Signature data that does not stack into arrays: compare one by one
+        results = []
+        for computed, signature_data in zip(self._verification_records(invariants), signatures):
+            try:
+                results.append(self._signature_matches(computed, signature_data))
+            except Exception as e:
+                print(f"Verification error: {e}")
+                results.append(False)
+        return results
+    
+    def _signatures_match(self, invariants: Dict[str, np.ndarray], signatures: List[Dict]) -> Optional[List[bool]]:
+        """Array version of _signature_matches; None if the signature data cannot be stacked"""
+        import numpy as np
+        batch, n = invariants['spectral_signature'].shape
+        try:
+            fields = {key: np.array([signature_data[key] for signature_data in signatures])
+                      for key in ('graph_hash', 'spectral_signature', 'degree_sequence', 'clustering_coeff',
+                                  'morph_signature', 'vertices_count', 'edges_count')}
+        except (KeyError, TypeError, ValueError):
+            return None
+        numeric = [array for key, array in fields.items() if key != 'graph_hash']
+        if (fields['graph_hash'].dtype.kind != 'U' or any(array.dtype.kind not in 'biuf' for array in numeric)
+                or fields['spectral_signature'].shape != (batch, n) or fields['degree_sequence'].shape != (batch, n)
+                or any(array.shape != (batch,) for key, array in fields.items()
+                       if key not in ('spectral_signature', 'degree_sequence'))):
+            return None
+        graph_hashes = np.frombuffer(invariants['graph_hash'].tobytes().hex().encode(), dtype='S16').astype('U16')
+        matches = (
+            (fields['morph_signature'] == invariants['morph_signature']) &
+            (fields['graph_hash'] == graph_hashes) &
+            (np.abs(invariants['spectral_signature'] - fields['spectral_signature']) < 1e-8).all(axis=1) &
+            (fields['degree_sequence'] == invariants['degree_sequence']).all(axis=1) &
+            (np.abs(invariants['clustering_coeff'] - fields['clustering_coeff']) < 1e-8) &
+            (fields['vertices_count'] == self.vertices) &
+            (fields['edges_count'] == invariants['edges_count'])
+        )
+        return matches.tolist()
+    
+    def _signature_matches(self, computed: Dict, signature_data: Dict) -> bool:
+        """Checks the internal consistency of signature data against recomputed properties"""
+        # Element-wise comparison for spectral signature
+        spectral_ok = (
+            len(computed['spectral_signature']) == len(signature_data['spectral_signature']) and
+            all(abs(a - b) < 1e-8 for a, b in zip(computed['spectral_signature'], signature_data['spectral_signature']))
+        )
+        checks = [
+            computed['morph_signature'] == signature_data['morph_signature'],
+            computed['graph_hash'] == signature_data['graph_hash'],
+            spectral_ok,
+            computed['degree_sequence'] == signature_data['degree_sequence'],
+            abs(computed['clustering_coeff'] - signature_data['clustering_coeff']) < 1e-8,
+            signature_data['vertices_count'] == self.vertices,
+            signature_data['edges_count'] == int(computed['edges_count'])
+        ]
+        return all(checks)
+    
     def demo_self_verification(self):
         """Demonstration of the self-verifiable system"""
         print("=== ORCP v2.0 - SELF-VERIFIABLE SYSTEM ===\n")
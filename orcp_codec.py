@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+ORCP - OpenRed Cryptographic Pattern
+Compact Binary Codec for verification_data
+Versioned wire format with fixed-point spectral values, a bit-packed degree
+sequence and the raw graph hash, plus batch encode/decode over NumPy structured arrays
+Author : Diego Morales Magri - October 2025
+"""
+
+from typing import Dict, Iterable
+
+import numpy as np
+
+from ORCP import FIXED_POINT_SCALE  # shared with the public key derivation
+
+# Wire format, version 1 (little-endian, no padding):
+#   u8  version
+#   u8  vertices count (n)
+#   8B  graph hash (raw bytes of the 16-character hex hash)
+#   u16 morphological signature
+#   u16 edges count
+#   u32 clustering coefficient, fixed point (x 1e8)
+#   n x i32 (n <= 21) or n x i64 spectral signature, fixed point (x 1e8)
+#   degree sequence, bit-packed at bit_length(n - 1) bits per degree
+FORMAT_VERSION = 1
+MAX_VERTICES = 255
+I32_MAX_VERTICES = 21              # |eigenvalue| <= n - 1, and 20e8 < 2**31
+GRAPH_HASH_BYTES = 8
+
+def degree_bits(vertices: int) -> int:
+    """Bits needed to store one degree (0 .. vertices - 1)."""
+    return max(1, (vertices - 1).bit_length())
+
+def wire_dtype(vertices: int) -> np.dtype:
+    """Structured dtype of one encoded record; an array of them is a batch."""
+    if not 1 <= vertices <= MAX_VERTICES:
+        raise ValueError(f"Vertices count must be in 1..{MAX_VERTICES}, got {vertices}")
+    spectral = '<i4' if vertices <= I32_MAX_VERTICES else '<i8'
+    return np.dtype([
+        ('version', 'u1'),
+        ('vertices', 'u1'),
+        ('graph_hash', 'u1', (GRAPH_HASH_BYTES,)),
+        ('morph_signature', '<u2'),
+        ('edges_count', '<u2'),
+        ('clustering_coeff', '<u4'),
+        ('spectral_signature', spectral, (vertices,)),
+        ('degree_sequence', 'u1', ((vertices * degree_bits(vertices) + 7) // 8,)),
+    ])
+
+def invariants_dtype(vertices: int) -> np.dtype:
+    """Decoded batch layout; field names match the key store's record_dtype."""
+    return np.dtype([
+        ('graph_hash', 'u1', (GRAPH_HASH_BYTES,)),
+        ('spectral_signature', '<f8', (vertices,)),
+        ('degree_sequence', '<u2', (vertices,)),
+        ('clustering_coeff', '<f8'),
+        ('morph_signature', '<u4'),
+        ('edges_count', '<u4'),
+    ])
+
+def _pack_degrees(degrees: np.ndarray, vertices: int) -> np.ndarray:
+    """Bit-packs a (batch, n) degree matrix into (batch, packed bytes)."""
+    shifts = np.arange(degree_bits(vertices) - 1, -1, -1, dtype=np.uint16)
+    bits = (degrees.astype(np.uint16)[..., None] >> shifts) & 1
+    return np.packbits(bits.reshape(len(degrees), -1).astype(np.uint8), axis=1)
+
+def _unpack_degrees(packed: np.ndarray, vertices: int) -> np.ndarray:
+    width = degree_bits(vertices)
+    bits = np.unpackbits(packed, axis=1)[:, :vertices * width].reshape(len(packed), vertices, width)
+    weights = (1 << np.arange(width - 1, -1, -1)).astype(np.uint16)
+    return (bits.astype(np.uint16) * weights).sum(axis=2, dtype=np.uint16)
+
+def _to_fixed(values) -> np.ndarray:
+    return np.rint(np.asarray(values, dtype=np.float64) * FIXED_POINT_SCALE).astype(np.int64)
+
+def invariants_from_dicts(records: Iterable[Dict], vertices: int) -> np.ndarray:
+    """Collects verification_data dicts into an `invariants_dtype` array."""
+    records = list(records)
+    batch = np.zeros(len(records), dtype=invariants_dtype(vertices))
+    for row, data in zip(batch, records):
+        if data['vertices_count'] != vertices:
+            raise ValueError(f"Expected {vertices}-vertex verification data, got {data['vertices_count']}")
+        row['graph_hash'] = np.frombuffer(bytes.fromhex(data['graph_hash']), dtype='u1')
+        row['spectral_signature'] = data['spectral_signature']
+        row['degree_sequence'] = data['degree_sequence']
+        row['clustering_coeff'] = data['clustering_coeff']
+        row['morph_signature'] = data['morph_signature']
+        row['edges_count'] = data['edges_count']
+    return batch
+
+def encode_batch(records: np.ndarray, vertices: int) -> np.ndarray:
+    """Encodes a structured array of invariants (`invariants_dtype`, or key
+    store records) into wire records; `.tobytes()` gives the payload."""
+    wire = np.zeros(len(records), dtype=wire_dtype(vertices))
+    wire['version'] = FORMAT_VERSION
+    wire['vertices'] = vertices
+    wire['graph_hash'] = records['graph_hash']
+    wire['morph_signature'] = records['morph_signature']
+    wire['edges_count'] = records['edges_count']
+    wire['clustering_coeff'] = _to_fixed(records['clustering_coeff'])
+    wire['spectral_signature'] = _to_fixed(records['spectral_signature'])
+    wire['degree_sequence'] = _pack_degrees(records['degree_sequence'], vertices)
+    return wire
+
+def decode_batch(payload, vertices: int) -> np.ndarray:
+    """Decodes a payload of concatenated wire records into an `invariants_dtype` array."""
+    wire = np.frombuffer(payload, dtype=wire_dtype(vertices))
+    if len(wire) and (np.any(wire['version'] != FORMAT_VERSION) or np.any(wire['vertices'] != vertices)):
+        raise ValueError(f"Unsupported record in payload (expected version {FORMAT_VERSION}, {vertices} vertices)")
+    batch = np.empty(len(wire), dtype=invariants_dtype(vertices))
+    batch['graph_hash'] = wire['graph_hash']
+    batch['morph_signature'] = wire['morph_signature']
+    batch['edges_count'] = wire['edges_count']
+    batch['clustering_coeff'] = wire['clustering_coeff'] / FIXED_POINT_SCALE
+    batch['spectral_signature'] = wire['spectral_signature'] / FIXED_POINT_SCALE
+    batch['degree_sequence'] = _unpack_degrees(wire['degree_sequence'], vertices)
+    return batch
+
+def to_verification_data(row: np.void, vertices: int) -> Dict:
+    """Rebuilds the verification_data dict from one decoded batch row."""
+    return {
+        'graph_hash': row['graph_hash'].tobytes().hex(),
+        'spectral_signature': row['spectral_signature'].tolist(),
+        'degree_sequence': row['degree_sequence'].tolist(),
+        'clustering_coeff': float(row['clustering_coeff']),
+        'morph_signature': int(row['morph_signature']),
+        'vertices_count': vertices,
+        'edges_count': int(row['edges_count']),
+    }
+
+def encode(verification_data: Dict) -> bytes:
+    """Encodes a single verification_data dict."""
+    vertices = verification_data['vertices_count']
+    return encode_batch(invariants_from_dicts([verification_data], vertices), vertices).tobytes()
+
+def decode(payload: bytes) -> Dict:
+    """Decodes a single record; the vertices count is read from its header."""
+    if len(payload) < 2:
+        raise ValueError(f"Truncated verification_data record ({len(payload)} bytes)")
+    version, vertices = payload[0], payload[1]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported verification_data format version {version}")
+    if len(payload) != wire_dtype(vertices).itemsize:
+        raise ValueError(f"Expected a single {wire_dtype(vertices).itemsize}-byte record, got {len(payload)} bytes")
+    return to_verification_data(decode_batch(payload, vertices)[0], vertices)
+
+# Example usage
+if __name__ == "__main__":
+    import json
+    import pickle
+    import time
+    from ORCP import ORCP
+
+    orcp = ORCP(vertices=14)
+    motifs = [orcp.generate_motif() for _ in range(2000)]
+    keys = [orcp.generate_self_verifiable_key(m) for m in motifs]
+    datas = [data for _, data in keys]
+
+    motif, data = motifs[0], datas[0]
+    payload = encode(data)
+    as_json = json.dumps(data, default=float).encode()
+    print(f"Binary: {len(payload)} bytes | JSON: {len(as_json)} bytes | pickle: {len(pickle.dumps(data))} bytes")
+    print(f"Decoded record verifies: {orcp.verify_signature_without_public_key(motif, decode(payload))}")
+
+    start = time.perf_counter()
+    wire = encode_batch(invariants_from_dicts(datas, 14), 14).tobytes()
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = decode_batch(wire, 14)
+    decode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    json.loads(json.dumps(datas, default=float))
+    json_time = time.perf_counter() - start
+    valid = sum(orcp.verify_signature_without_public_key(m, to_verification_data(row, 14))
+                for m, row in zip(motifs, batch))
+    print(f"Batch of {len(datas)}: {len(wire)} bytes, encode {encode_time*1000:.2f} ms, "
+          f"decode {decode_time*1000:.2f} ms (JSON round trip {json_time*1000:.2f} ms)")
+    print(f"Decoded batch verifies: {valid}/{len(datas)}")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+ORCP - OpenRed Cryptographic Pattern
+Import-Time Benchmark
+Measures the startup cost of short-lived processes using ORCP
+(each scenario runs in a fresh interpreter)
+Author : Diego Morales Magri - October 2025
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+SCENARIOS = {
+    'import only': "import ORCP",
+    'generate_motif': "import ORCP; ORCP.ORCP(vertices=14).generate_motif()",
+    'key + verification': (
+        "import ORCP; o = ORCP.ORCP(vertices=14); m = o.generate_motif(); "
+        "k, d = o.generate_self_verifiable_key(m); o.verify_signature_without_public_key(m, d)"
+    ),
+    'key + shared key (HKDF)': (
+        "import ORCP; o = ORCP.ORCP(vertices=14); "
+        "a, _ = o.generate_self_verifiable_key(o.generate_motif()); "
+        "b, _ = o.generate_self_verifiable_key(o.generate_motif()); o.create_shared_key(a, b)"
+    ),
+}
+
+def time_scenario(code, runs):
+    """Returns the wall-clock times (s) of `runs` fresh interpreters executing `code`."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+def heavy_modules_loaded(code):
+    """Lists which heavy dependencies end up in sys.modules after running `code`."""
+    probe = code + "; import sys; print(','.join(m for m in ('numpy', 'cryptography', 'networkx') if m in sys.modules))"
+    out = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, check=True, capture_output=True, text=True)
+    return out.stdout.strip() or '-'
+
+def run_benchmark(runs=20):
+    baseline = min(time_scenario("pass", runs))
+    print(f"Interpreter startup (baseline): {baseline*1000:.2f} ms\n")
+    print(f"{'Scenario':<26} {'Min(ms)':<10} {'Mean(ms)':<10} {'Over baseline':<14} {'Heavy modules'}")
+    for name, code in SCENARIOS.items():
+        times = time_scenario(code, runs)
+        best = min(times)
+        mean = sum(times) / len(times)
+        print(f"{name:<26} {best*1000:<10.2f} {mean*1000:<10.2f} {(best-baseline)*1000:<14.2f} {heavy_modules_loaded(code)}")
+
+if __name__ == '__main__':
+    run_benchmark()
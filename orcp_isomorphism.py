@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+ORCP - OpenRed Cryptographic Pattern
+Isomorphism Classes and Invariant Cache
+Canonical labelling of ORCP graphs, and a cache that lets isomorphic graphs share
+their spectral signature, degree sequence and clustering coefficient
+Author : Diego Morales Magri - October 2025
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ORCP import FIXED_POINT_SCALE
+
+def _refine(neighbors: List[List[int]], colors: List[int]) -> List[int]:
+    """Colour refinement to the coarsest equitable partition.
+
+    Colours are cell positions (index of the first vertex of the cell in the
+    ordered partition), so the result only depends on the graph structure.
+    """
+    n = len(colors)
+    cells = len(set(colors))
+    while True:
+        signatures = [(colors[v], sorted(colors[u] for u in neighbors[v])) for v in range(n)]
+        order = sorted(range(n), key=signatures.__getitem__)
+        refined = [0] * n
+        for i in range(1, n):
+            same = signatures[order[i]] == signatures[order[i - 1]]
+            refined[order[i]] = refined[order[i - 1]] if same else i
+        refined_cells = len(set(refined))
+        if refined_cells == cells:
+            return refined
+        colors, cells = refined, refined_cells
+
+class _Orbits:
+    """Orbits of the automorphisms that fix `fixed` pointwise, as a union-find.
+
+    Automorphisms are folded in as the search finds them, so siblings of a
+    search node share the work instead of rebuilding the partition each time.
+    """
+
+    def __init__(self, n: int, fixed: List[int]):
+        self.parent = list(range(n))
+        self.fixed = fixed
+        self.seen = 0
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def update(self, automorphisms: List[List[int]]):
+        for sigma in automorphisms[self.seen:]:
+            if all(sigma[v] == v for v in self.fixed):
+                for x, y in enumerate(sigma):
+                    if x == y:
+                        continue
+                    rx, ry = self.find(x), self.find(y)
+                    if rx != ry:
+                        self.parent[max(rx, ry)] = min(rx, ry)
+        self.seen = len(automorphisms)
+
+def _twin_classes(adj: np.ndarray) -> List[List[int]]:
+    """Classes of twins: vertices with the same open (non-adjacent twins, e.g.
+    isolated vertices) or closed (adjacent twins) neighbourhood.
+
+    Any permutation of a class is an automorphism.
+    """
+    n = adj.shape[0]
+    classes = []
+    for rows in (adj, adj | np.eye(n, dtype=bool)):
+        groups: Dict[bytes, List[int]] = {}
+        for v, row in enumerate(np.packbits(rows, axis=1)):
+            groups.setdefault(row.tobytes(), []).append(v)
+        classes.extend(members for members in groups.values() if len(members) > 1)
+    return classes
+
+def canonical_labelling(adj_matrix: np.ndarray) -> Tuple[bytes, List[int]]:
+    """Canonical form of an (unlabelled) graph.
+
+    Returns (certificate, order): `order` lists the vertices in canonical
+    position order, and the certificate is the bit-packed adjacency matrix
+    permuted by it. Two graphs are isomorphic iff their certificates are equal.
+    Individualization-refinement search with automorphism pruning. Twins are
+    handled up front, so sparse graphs (many isolated or pendant vertices) do
+    not branch on them: a cell of twins is individualized in one step, and
+    swaps of twins seed the automorphisms used for pruning.
+    """
+    adj = np.asarray(adj_matrix) != 0
+    n = adj.shape[0]
+    neighbors = [np.flatnonzero(row).tolist() for row in adj]
+    twins = [set(members) for members in _twin_classes(adj)]
+    automorphisms: List[List[int]] = []
+    for members in map(sorted, twins):
+        # Swaps of consecutive twins: a class stays one orbit while its
+        # smallest members are fixed along the search path
+        for a, b in zip(members, members[1:]):
+            sigma = list(range(n))
+            sigma[a], sigma[b] = b, a
+            automorphisms.append(sigma)
+    first: Dict = {}
+    best: Dict = {}
+
+    def certificate(order: List[int]) -> bytes:
+        return np.packbits(adj[np.ix_(order, order)]).tobytes()
+
+    def leaf(order: List[int], path: List[int]) -> Optional[int]:
+        cert = certificate(order)
+        if not first:
+            first.update(cert=cert, order=order, path=path)
+            best.update(cert=cert, order=order)
+            return None
+        for reference in (first, best):
+            if cert == reference['cert']:
+                sigma = [0] * n
+                for a, b in zip(reference['order'], order):
+                    sigma[a] = b
+                automorphisms.append(sigma)
+                if reference is first:
+                    # This subtree is the image of the first path's: jump back
+                    # to the deepest node shared with the first path
+                    common = 0
+                    while common < len(path) and path[common] == first['path'][common]:
+                        common += 1
+                    return common
+                return None
+        if cert < best['cert']:
+            best.update(cert=cert, order=order)
+        return None
+
+    def search(colors: List[int], path: List[int]) -> Optional[int]:
+        colors = _refine(neighbors, colors)
+        if len(set(colors)) == n:
+            return leaf(sorted(range(n), key=colors.__getitem__), path)
+        sizes = {}
+        for c in colors:
+            sizes[c] = sizes.get(c, 0) + 1
+        target = min((size, c) for c, size in sizes.items() if size > 1)[1]
+        cell = [v for v in range(n) if colors[v] == target]
+        if any(twin.issuperset(cell) for twin in twins):
+            # Every order of individualizing interchangeable vertices leads to
+            # the same certificate: take them all at once, in index order
+            child = list(colors)
+            for i, v in enumerate(cell):
+                child[v] = target + i
+            return search(child, path + cell)
+        explored, orbits = [], _Orbits(n, path)
+        for v in cell:
+            if explored:
+                orbits.update(automorphisms)
+                if any(orbits.find(v) == orbits.find(w) for w in explored):
+                    continue
+            child = [c + 1 if c == target else c for c in colors]
+            child[v] = target
+            jump = search(child, path + [v])
+            explored.append(v)
+            if jump is not None and jump < len(path):
+                return jump
+        return None
+
+    search([0] * n, [])
+    return best['cert'], best['order']
+
+class InvariantCache:
+    """Shares the isomorphism-invariant properties of ORCP graphs.
+
+    Records (spectral signature, degree sequence, clustering coefficient) are
+    keyed by canonical form, and computed once per isomorphism class on the
+    class's canonical representative, so every member gets the same values
+    whatever its labelling. Classes are also grouped by their invariant tuple:
+    distinct classes sharing one (cospectral graphs with equal degrees and
+    clustering) are the weak-key collisions of ORCP.
+
+    The shared values are those of the representative, not of each member:
+    the clustering coefficient is summed in another vertex order and the
+    eigenvalues come from a permuted matrix, so they can differ from an
+    uncached computation in the last bits (or as -0.0 vs 0.0). Canonical
+    keys quantize at 1e-8 and are unaffected; ORCP refuses the cache with
+    the legacy key derivation, which hashes str() of the floats.
+
+    The cache is unbounded: it keeps one record per isomorphism class seen,
+    and one certificate per distinct labelled graph seen, so that repeated
+    patterns skip canonical labelling.
+    For large enrollment streams, call `clear()` periodically or use one
+    cache per analysis run.
+    """
+
+    def __init__(self):
+        self._records: Dict[bytes, Tuple] = {}
+        self._classes: Dict[Tuple, List[bytes]] = {}
+        self._labelled: Dict[bytes, bytes] = {}  # labelled adjacency -> certificate
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get_or_compute(self, adj_stack: np.ndarray, compute: Callable) -> List[Tuple]:
+        """Invariants of each graph of a (batch, n, n) stack.
+
+        Graphs already seen with the same labelling are found by their
+        adjacency bits; canonical labelling only runs on the others.
+        `compute` maps a stack to (spectral_signatures, degree_sequences,
+        clustering_coeffs); it is only called, batched, on the canonical
+        representatives of classes not yet cached.
+        """
+        keys = np.packbits(adj_stack.reshape(len(adj_stack), -1) != 0, axis=1)
+        certificates, missing, labelled = [], {}, {}
+        for adj, key in zip(adj_stack, keys):
+            key = key.tobytes()
+            cert = self._labelled.get(key) or labelled.get(key)
+            if cert is None:
+                cert, order = canonical_labelling(adj)
+                labelled[key] = cert
+                if cert not in self._records and cert not in missing:
+                    missing[cert] = adj[np.ix_(order, order)]
+            certificates.append(cert)
+        if missing:
+            spectral, degrees, clustering = compute(np.stack(list(missing.values())))
+            for i, cert in enumerate(missing):
+                spectral_row = np.array(spectral[i])
+                spectral_row.flags.writeable = False
+                record = (spectral_row, tuple(degrees[i]), clustering[i])
+                self._records[cert] = record
+                self._classes.setdefault(self._invariant_key(record), []).append(cert)
+        # Only remember labellings once their class record exists
+        self._labelled.update(labelled)
+        self.misses += len(missing)
+        self.hits += len(certificates) - len(missing)
+        return [self._records[cert] for cert in certificates]
+
+    @staticmethod
+    def _invariant_key(record: Tuple) -> Tuple:
+        spectral, degrees, clustering = record
+        return (tuple(np.rint(spectral * FIXED_POINT_SCALE).astype(np.int64).tolist()),
+                tuple(int(d) for d in degrees),
+                int(round(clustering * FIXED_POINT_SCALE)))
+
+    def class_count(self) -> int:
+        """Number of isomorphism classes seen."""
+        return len(self._records)
+
+    def invariant_class_count(self) -> int:
+        """Number of distinct invariant tuples seen."""
+        return len(self._classes)
+
+    def collisions(self) -> Dict[Tuple, List[bytes]]:
+        """Invariant tuples shared by non-isomorphic graphs, with their certificates."""
+        return {key: certs for key, certs in self._classes.items() if len(certs) > 1}
+
+    def clear(self):
+        self._records.clear()
+        self._classes.clear()
+        self._labelled.clear()
+        self.hits = self.misses = 0
+
+# Example usage
+if __name__ == "__main__":
+    import random
+    import time
+    from ORCP import ORCP
+
+    VERTICES = 8
+    NUM_GRAPHS = 20000
+    cache = InvariantCache()
+    orcp = ORCP(vertices=VERTICES, invariant_cache=cache)
+    # Low-entropy enrollment data: sparse patterns
+    motifs = [''.join('1' if random.random() < 0.2 else '0' for _ in range(orcp.total_bits))
+              for _ in range(NUM_GRAPHS)]
+
+    start = time.perf_counter()
+    uncached = ORCP(vertices=VERTICES).generate_self_verifiable_keys(motifs)
+    print(f"{NUM_GRAPHS} graphs ({VERTICES} vertices), no cache: {time.perf_counter() - start:.2f} s")
+    start = time.perf_counter()
+    keys = orcp.generate_self_verifiable_keys(motifs)
+    print(f"Cold cache: {time.perf_counter() - start:.2f} s, {cache.hits} hits, {cache.misses} misses")
+    start = time.perf_counter()
+    orcp.generate_self_verifiable_keys(motifs)
+    print(f"Warm cache (same patterns again): {time.perf_counter() - start:.2f} s")
+    print(f"Same keys as without cache: {[key for key, _ in keys] == [key for key, _ in uncached]}")
+    print(f"Isomorphism classes: {cache.class_count()}")
+    print(f"Distinct invariant tuples: {cache.invariant_class_count()}")
+    print(f"Invariant tuples shared by non-isomorphic graphs: {len(cache.collisions())}")
+    print(f"Distinct public keys: {len({key for key, _ in keys})}")
+    valid = ORCP(vertices=VERTICES).verify_signatures_without_public_key(motifs, [data for _, data in keys])
+    print(f"Verified without cache: {sum(valid)}/{NUM_GRAPHS}")
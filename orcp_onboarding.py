@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+ORCP - OpenRed Cryptographic Pattern
+Batched Device Onboarding Pipeline
+Streams device motifs through key generation, shared key derivation against a
+gateway key and tag creation, yielding (device_id, public_key, shared_key, tag)
+Author : Diego Morales Magri - October 2025
+"""
+
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from ORCP import ORCP
+from orcp_tag_verification_example import create_tag
+
+# Each stage consumes and yields batches of per-device tuples, lazily, so only
+# one batch per stage is alive at any time and memory use does not grow with
+# the number of devices. A device that fails a stage is replaced by a _Failure
+# that later stages pass through, so one bad device never aborts the stream.
+
+_Failure = namedtuple('_Failure', 'device_id error')
+
+def _report_error(device_id: str, error: Exception):
+    print(f"Onboarding error for {device_id}: {error!r}")
+
+def _attempt(device_id: str, step: Callable, *args):
+    try:
+        return step(*args)
+    except Exception as e:
+        return _Failure(device_id, e)
+
+def _each(batch: List, step: Callable) -> List:
+    """Applies `step` to each successful entry of a batch, catching per-device errors"""
+    return [entry if isinstance(entry, _Failure) else _attempt(entry[0], step, entry) for entry in batch]
+
+def _batched(devices: Iterable[Tuple[str, str]], batch_size: int) -> Iterator[List[Tuple[str, str]]]:
+    iterator = iter(devices)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def _key_stage(orcp: ORCP, batches):
+    """(device_id, motif) -> (device_id, motif, public_key)"""
+    for batch in batches:
+        try:
+            keys = orcp.generate_self_verifiable_keys([motif for _, motif in batch])
+        except Exception:
+            # A malformed motif in the batch: generate one by one
+            keys = [_attempt(device_id, orcp.generate_self_verifiable_key, motif) for device_id, motif in batch]
+        yield [key if isinstance(key, _Failure) else (device_id, motif, key[0])
+               for (device_id, motif), key in zip(batch, keys)]
+
+def _shared_key_stage(orcp: ORCP, gateway_public_key: str, salt: bytes, info: bytes, batches):
+    """(device_id, motif, public_key) -> (device_id, motif, public_key, shared_key)"""
+    def derive(entry):
+        return entry + (orcp.create_shared_key(entry[2], gateway_public_key, salt=salt, info=info),)
+    for batch in batches:
+        yield _each(batch, derive)
+
+def _tag_stage(batches):
+    """(device_id, motif, public_key, shared_key) -> (device_id, public_key, shared_key, tag)"""
+    def tag(entry):
+        device_id, motif, public_key, shared_key = entry
+        return device_id, public_key, shared_key, create_tag(motif, bin(int(shared_key, 16))[2:])
+    for batch in batches:
+        yield _each(batch, tag)
+
+def _pipeline(orcp: ORCP, gateway_public_key: str, salt: bytes, info: bytes, batches):
+    return _tag_stage(_shared_key_stage(orcp, gateway_public_key, salt, info, _key_stage(orcp, batches)))
+
+def _onboard_batch(vertices: int, key_derivation: str, gateway_public_key: str, salt: bytes, info: bytes,
+                   batch: List[Tuple[str, str]]) -> List:
+    """Runs all stages over one batch (worker process entry point)"""
+    orcp = ORCP(vertices=vertices, key_derivation=key_derivation)
+    return next(_pipeline(orcp, gateway_public_key, salt, info, iter([batch])))
+
+def onboard_devices(devices: Iterable[Tuple[str, str]], gateway_public_key: str, vertices: int = 14,
+                    batch_size: int = 256, processes: Optional[int] = None, key_derivation: str = 'canonical',
+                    salt: bytes = b"", info: bytes = b"orcp-shared-key",
+                    on_error: Optional[Callable[[str, Exception], None]] = None) -> Iterator[Tuple[str, str, str, str]]:
+    """Onboards a stream of (device_id, motif) pairs against a gateway public key.
+
+    Yields (device_id, public_key, shared_key, tag) records in input order.
+    Devices that fail a stage (malformed or all-zero motif, ...) are skipped
+    and reported through `on_error(device_id, error)`, which prints by default.
+    With `processes`, batches are spread over a process pool, with at most
+    two batches in flight per worker.
+    """
+    on_error = on_error or _report_error
+
+    def emit(results):
+        for entry in results:
+            if isinstance(entry, _Failure):
+                on_error(entry.device_id, entry.error)
+            else:
+                yield entry
+
+    batches = _batched(devices, batch_size)
+    if not processes:
+        orcp = ORCP(vertices=vertices, key_derivation=key_derivation)
+        for results in _pipeline(orcp, gateway_public_key, salt, info, batches):
+            yield from emit(results)
+        return
+
+    work = partial(_onboard_batch, vertices, key_derivation, gateway_public_key, salt, info)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        in_flight = deque((pool.submit(work, batch), batch) for batch in islice(batches, 2 * processes))
+        while in_flight:
+            future, batch = in_flight.popleft()
+            try:
+                results = future.result()
+            except Exception as e:
+                # The worker itself failed (crash, unpicklable result): report the whole batch
+                results = [_Failure(device_id, e) for device_id, _ in batch]
+            for batch in islice(batches, 1):
+                in_flight.append((pool.submit(work, batch), batch))
+            yield from emit(results)
+
+# Example usage
+if __name__ == "__main__":
+    import time
+    from orcp_tag_verification_example import verify_tag
+
+    NUM_DEVICES = 20000
+    orcp = ORCP(vertices=14)
+    gateway_motif = orcp.generate_motif()
+    gateway_public_key, _ = orcp.generate_self_verifiable_key(gateway_motif)
+    fleet = ((f"device-{i:06d}", orcp.generate_motif()) for i in range(NUM_DEVICES))
+
+    # Per-call baseline
+    sample = [(f"device-{i:06d}", orcp.generate_motif()) for i in range(2000)]
+    start = time.perf_counter()
+    for device_id, motif in sample:
+        public_key, _ = orcp.generate_self_verifiable_key(motif)
+        shared_key = orcp.create_shared_key(public_key, gateway_public_key)
+        create_tag(motif, bin(int(shared_key, 16))[2:])
+    print(f"Per-call chain: {len(sample)/(time.perf_counter() - start):,.0f} devices/s")
+
+    start = time.perf_counter()
+    count = 0
+    for device_id, public_key, shared_key, tag in onboard_devices(fleet, gateway_public_key):
+        count += 1
+    print(f"Pipeline: {count/(time.perf_counter() - start):,.0f} devices/s ({count} devices)")
+
+    records = list(onboard_devices(sample, gateway_public_key, processes=2, batch_size=128))
+    valid = sum(verify_tag(motif, bin(int(shared_key, 16))[2:], tag)
+                for (_, motif), (_, _, shared_key, tag) in zip(sample, records))
+    print(f"Process pool: {len(records)} records, {valid} tags verified, order kept: "
+          f"{[d for d, *_ in records] == [d for d, _ in sample]}")
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+ORCP - OpenRed Cryptographic Pattern
+Persistent Key Store
+Append-only, memory-mapped store of (motif, public_key, verification_data) records
+with O(1) lookup by public key through an on-disk hash index
+Author : Diego Morales Magri - October 2025
+"""
+
+import os
+import struct
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+# On-disk layout
+# <path>      : 64-byte header, then `capacity` fixed-width records
+# <path>.idx  : 64-byte header, then `slots` uint64 entries (record index + 1, 0 = empty)
+DATA_MAGIC = b'ORCPDAT1'
+INDEX_MAGIC = b'ORCPIDX1'
+FORMAT_VERSION = 1
+HEADER_SIZE = 64
+DATA_HEADER = struct.Struct('<8sHHIQQ')   # magic, version, vertices, record size, count, capacity
+INDEX_HEADER = struct.Struct('<8sHQQ')    # magic, version, slots, used
+INDEX_INCOMPLETE = 2**64 - 1              # `used` while an index is being rebuilt
+PUBLIC_KEY_BYTES = 16                     # 32-character hex public key
+GRAPH_HASH_BYTES = 8                      # 16-character hex graph hash
+MIN_CAPACITY = 1024
+
+def record_dtype(vertices: int) -> np.dtype:
+    """Fixed-width structured record for a store of graphs with `vertices` vertices."""
+    total_bits = vertices + vertices * (vertices - 1) // 2
+    return np.dtype([
+        ('public_key', 'u1', (PUBLIC_KEY_BYTES,)),
+        ('graph_hash', 'u1', (GRAPH_HASH_BYTES,)),
+        ('motif', 'u1', ((total_bits + 7) // 8,)),      # bit-packed pattern
+        ('spectral_signature', '<f8', (vertices,)),
+        ('degree_sequence', '<u2', (vertices,)),
+        ('clustering_coeff', '<f8'),
+        ('morph_signature', '<u4'),
+        ('edges_count', '<u4'),
+    ])
+
+def _key_bytes(public_key) -> bytes:
+    key = bytes.fromhex(public_key) if isinstance(public_key, str) else bytes(public_key)
+    if len(key) != PUBLIC_KEY_BYTES:
+        raise ValueError(f"Public key must be {PUBLIC_KEY_BYTES} bytes, got {len(key)}")
+    return key
+
+def _slot_hash(key: bytes) -> int:
+    # Public keys are SHA-256 prefixes, so their leading bytes are already uniform
+    return int.from_bytes(key[:8], 'little')
+
+class ORCPKeyStore:
+    """Append-only, memory-mapped store of ORCP enrollments.
+
+    Records are fixed-width (see `record_dtype`) and read back zero-copy as
+    NumPy structured arrays; lookups by public key go through an open-addressing
+    hash index kept in a sibling `.idx` file. A store has a single writer.
+    """
+
+    def __init__(self, path: str, vertices: int = 14, capacity: int = MIN_CAPACITY):
+        self.path = path
+        self.index_path = path + '.idx'
+        if os.path.exists(path):
+            self._open_existing()
+        else:
+            self._create(vertices, max(capacity, MIN_CAPACITY))
+
+    # ------------------------------------------------------------------ files
+
+    def _create(self, vertices: int, capacity: int):
+        self.vertices = vertices
+        self.dtype = record_dtype(vertices)
+        self.count = 0
+        self._map_data(capacity, create=True)
+        self._rebuild_index(self._slots_for(capacity))
+
+    def _open_existing(self):
+        with open(self.path, 'rb') as f:
+            magic, version, vertices, record_size, count, capacity = DATA_HEADER.unpack(f.read(DATA_HEADER.size))
+        if magic != DATA_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not an ORCP key store (version {FORMAT_VERSION})")
+        self.vertices = vertices
+        self.dtype = record_dtype(vertices)
+        if record_size != self.dtype.itemsize:
+            raise ValueError(f"Record size mismatch in {self.path}: {record_size} != {self.dtype.itemsize}")
+        self.count = count
+        self._map_data(capacity, create=False)
+        slots = self._slots_for(capacity)
+        if self._index_is_consistent(slots):
+            self._map_index(slots, create=False)
+        else:
+            # Missing, foreign or left incomplete by a crash (during a rebuild,
+            # or between the index and data header writes of an append)
+            self._rebuild_index(slots)
+
+    def _index_is_consistent(self, slots: int) -> bool:
+        if not os.path.exists(self.index_path) or os.path.getsize(self.index_path) != HEADER_SIZE + slots * 8:
+            return False
+        with open(self.index_path, 'rb') as f:
+            magic, version, index_slots, used = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+        return (magic, version, index_slots, used) == (INDEX_MAGIC, FORMAT_VERSION, slots, self.count)
+
+    def _map_data(self, capacity: int, create: bool):
+        size = HEADER_SIZE + capacity * self.dtype.itemsize
+        with open(self.path, 'r+b' if not create else 'w+b') as f:
+            f.truncate(size)
+        self.capacity = capacity
+        self._header = np.memmap(self.path, dtype='u1', mode='r+', shape=(HEADER_SIZE,))
+        self._records = np.memmap(self.path, dtype=self.dtype, mode='r+', offset=HEADER_SIZE, shape=(capacity,))
+        self._write_data_header()
+
+    def _map_index(self, slots: int, create: bool):
+        if create:
+            with open(self.index_path, 'w+b') as f:
+                f.truncate(HEADER_SIZE + slots * 8)
+        self._index_header = np.memmap(self.index_path, dtype='u1', mode='r+', shape=(HEADER_SIZE,))
+        self._index = np.memmap(self.index_path, dtype='<u8', mode='r+', offset=HEADER_SIZE, shape=(slots,))
+        if create:
+            self._write_index_header(INDEX_INCOMPLETE)
+
+    def _write_data_header(self):
+        self._header[:DATA_HEADER.size] = np.frombuffer(DATA_HEADER.pack(
+            DATA_MAGIC, FORMAT_VERSION, self.vertices, self.dtype.itemsize, self.count, self.capacity), dtype='u1')
+
+    def _write_index_header(self, used: Optional[int] = None):
+        # `used` must equal the data header's count for the index to be trusted
+        self._index_header[:INDEX_HEADER.size] = np.frombuffer(INDEX_HEADER.pack(
+            INDEX_MAGIC, FORMAT_VERSION, len(self._index), self.count if used is None else used), dtype='u1')
+
+    @staticmethod
+    def _slots_for(capacity: int) -> int:
+        # Power of two, kept at most half full
+        slots = 1
+        while slots < 2 * capacity:
+            slots <<= 1
+        return slots
+
+    # ------------------------------------------------------------------ index
+
+    def _probe(self, key: bytes) -> Tuple[int, int]:
+        """Returns (slot, record index) for `key`, record index -1 if absent."""
+        mask = len(self._index) - 1
+        slot = _slot_hash(key) & mask
+        while True:
+            entry = int(self._index[slot])
+            if entry == 0:
+                return slot, -1
+            if self._records[entry - 1]['public_key'].tobytes() == key:
+                return slot, entry - 1
+            slot = (slot + 1) & mask
+
+    def _release_data(self):
+        # Open mappings must be closed before their file is resized: Windows
+        # refuses to truncate a file that is still mapped
+        if hasattr(self, '_records'):
+            self._records.flush()
+            self._header.flush()
+            del self._records, self._header
+
+    def _release_index(self):
+        if hasattr(self, '_index'):
+            self._index.flush()
+            self._index_header.flush()
+            del self._index, self._index_header
+
+    def _rebuild_index(self, slots: int):
+        self._release_index()
+        self._map_index(slots, create=True)
+        self._index[:] = self._build_index(self._records['public_key'][:self.count], slots)
+        self._write_index_header()
+
+    @staticmethod
+    def _build_index(keys: np.ndarray, slots: int) -> np.ndarray:
+        """Linear-probing table of `slots` entries for a (count, 16) key array.
+
+        Keys are inserted in vectorized rounds: each pending key tries its
+        current slot, one key per free slot wins, and the others move on to
+        the next slot. A key only passes slots that are already taken, so the
+        table is valid for `_probe` (rounds ~ longest probe sequence).
+        """
+        mask = np.uint64(slots - 1)
+        table = np.zeros(slots, dtype='<u8')
+        positions = np.ascontiguousarray(keys[:, :8]).view('<u8').ravel() & mask
+        pending = np.arange(len(keys), dtype=np.uint64)
+        while pending.size:
+            candidates = positions[pending]
+            free = table[candidates] == 0
+            taken, first = np.unique(candidates[free], return_index=True)
+            table[taken] = pending[free][first] + 1
+            placed = np.zeros(pending.size, dtype=bool)
+            placed[np.flatnonzero(free)[first]] = True
+            pending = pending[~placed]
+            positions[pending] = (positions[pending] + np.uint64(1)) & mask
+        return table
+
+    def _grow(self):
+        self._release_data()
+        self._release_index()
+        self._map_data(self.capacity * 2, create=False)
+        self._rebuild_index(self._slots_for(self.capacity))
+
+    # ------------------------------------------------------------------ API
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, public_key) -> bool:
+        return self._probe(_key_bytes(public_key))[1] >= 0
+
+    def append(self, motif: str, public_key: str, verification_data: Dict) -> int:
+        """Appends an enrollment and returns its record index.
+
+        Raises ValueError if the public key is already stored, or if the
+        motif or verification data do not fit this store; nothing is written then.
+        """
+        key = _key_bytes(public_key)
+        total_bits = self.vertices + self.vertices * (self.vertices - 1) // 2
+        if len(motif) != total_bits or not set(motif) <= {'0', '1'}:
+            raise ValueError(f"Motif must be {total_bits} binary characters")
+        if verification_data['vertices_count'] != self.vertices:
+            raise ValueError(f"Store holds {self.vertices}-vertex graphs, got {verification_data['vertices_count']}")
+        if self._probe(key)[1] >= 0:
+            raise ValueError(f"Public key already stored: {public_key}")
+
+        # Build the whole record before touching the map
+        record = np.zeros((), dtype=self.dtype)
+        record['public_key'] = np.frombuffer(key, dtype='u1')
+        record['graph_hash'] = np.frombuffer(bytes.fromhex(verification_data['graph_hash']), dtype='u1')
+        record['motif'] = np.packbits(np.frombuffer(motif.encode(), dtype='u1') - ord('0'))
+        record['spectral_signature'] = verification_data['spectral_signature']
+        record['degree_sequence'] = verification_data['degree_sequence']
+        record['clustering_coeff'] = verification_data['clustering_coeff']
+        record['morph_signature'] = verification_data['morph_signature']
+        record['edges_count'] = verification_data['edges_count']
+
+        if self.count == self.capacity:
+            self._grow()
+        self._records[self.count] = record
+
+        # Index header first: until the data header is written, `used` and
+        # `count` disagree and a reopen after a crash rebuilds the index
+        slot, _ = self._probe(key)
+        self._write_index_header(self.count + 1)
+        self._index[slot] = self.count + 1
+        self.count += 1
+        self._write_data_header()
+        return self.count - 1
+
+    def lookup(self, public_key) -> Optional[np.void]:
+        """Returns the record stored under `public_key` (a view into the map), or None."""
+        index = self._probe(_key_bytes(public_key))[1]
+        return self._records[index] if index >= 0 else None
+
+    def records(self) -> np.ndarray:
+        """Zero-copy structured array view of all stored records.
+
+        Views returned by `records()` and `lookup()` are stale once an append
+        grows the store (the file is remapped), and on Windows they must be
+        released before such an append, which cannot resize a mapped file.
+        """
+        return self._records[:self.count]
+
+    def __iter__(self) -> Iterator[np.void]:
+        return iter(self.records())
+
+    def motif(self, record: np.void) -> str:
+        """Unpacks the pattern bits of a record."""
+        total_bits = self.vertices + self.vertices * (self.vertices - 1) // 2
+        bits = np.unpackbits(record['motif'])[:total_bits]
+        return (bits + ord('0')).tobytes().decode()
+
+    def verification_data(self, record: np.void) -> Dict:
+        """Rebuilds the `verification_data` dict of a record, as produced by ORCP."""
+        return {
+            'graph_hash': record['graph_hash'].tobytes().hex(),
+            'spectral_signature': record['spectral_signature'].tolist(),
+            'degree_sequence': record['degree_sequence'].tolist(),
+            'clustering_coeff': float(record['clustering_coeff']),
+            'morph_signature': int(record['morph_signature']),
+            'vertices_count': self.vertices,
+            'edges_count': int(record['edges_count']),
+        }
+
+    def flush(self):
+        self._records.flush()
+        self._header.flush()
+        self._index.flush()
+        self._index_header.flush()
+
+    def close(self):
+        self._release_data()
+        self._release_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+    import time
+    from ORCP import ORCP
+
+    orcp = ORCP(vertices=14)
+    path = os.path.join(tempfile.mkdtemp(), 'orcp_keys.dat')
+    enrollments = []
+    with ORCPKeyStore(path, vertices=14) as store:
+        start = time.perf_counter()
+        for _ in range(5000):
+            motif = orcp.generate_motif()
+            public_key, verification_data = orcp.generate_self_verifiable_key(motif)
+            store.append(motif, public_key, verification_data)
+            enrollments.append((motif, public_key))
+        print(f"Enrolled {len(store)} devices in {time.perf_counter() - start:.2f} s "
+              f"({store.dtype.itemsize} bytes/record)")
+
+    with ORCPKeyStore(path) as store:
+        start = time.perf_counter()
+        valid = 0
+        for motif, public_key in enrollments:
+            record = store.lookup(public_key)
+            valid += store.motif(record) == motif and orcp.verify_signature_without_public_key(
+                motif, store.verification_data(record))
+        print(f"Reopened store: {valid}/{len(enrollments)} records verified "
+              f"in {time.perf_counter() - start:.2f} s")
+        print(f"Mean edges over the registry: {store.records()['edges_count'].mean():.2f}")
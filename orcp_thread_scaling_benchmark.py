@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+ORCP - OpenRed Cryptographic Pattern
+Thread Scaling Benchmark
+Measures key generation and verification throughput from 1 to N threads
+Author : Diego Morales Magri - October 2025
+"""
+
+import os
+import sys
+import time
+from ORCP import ORCP
+from orcp_parallel import ORCPBatchExecutor
+
+def gil_status():
+    if not hasattr(sys, '_is_gil_enabled'):
+        return 'enabled (regular build)'
+    return 'enabled' if sys._is_gil_enabled() else 'disabled (free-threaded build)'
+
+def gil_free_share(orcp, motifs, repeats=20):
+    """Share of batched key generation spent in the GIL-releasing NumPy/LAPACK kernels."""
+    adj_stack = orcp._adjacency_matrices(motifs)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        orcp._spectral_signatures(adj_stack)
+        orcp._clustering_coefficients(adj_stack)
+    kernels = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(repeats):
+        orcp.generate_self_verifiable_keys(motifs)
+    return kernels / (time.perf_counter() - start)
+
+def run_benchmark(keys=20000, vertices=14, chunk_size=256, max_threads=None):
+    max_threads = max_threads or os.cpu_count() or 1
+    thread_counts = sorted({1, 2, 4, 8, 16, max_threads} & set(range(1, max_threads + 1)))
+    orcp = ORCP(vertices=vertices)
+    motifs = [orcp.generate_motif() for _ in range(keys)]
+
+    # Sequential per-key baseline (one call per key)
+    start = time.perf_counter()
+    signatures = [orcp.generate_self_verifiable_key(m)[1] for m in motifs]
+    per_key = time.perf_counter() - start
+
+    print(f"Python {sys.version.split()[0]}, GIL {gil_status()}, {os.cpu_count()} CPUs")
+    print(f"{keys} keys, {vertices} vertices, chunks of {chunk_size}")
+    print(f"Per-key calls, single thread: {keys/per_key:,.0f} keys/s")
+    share = gil_free_share(orcp, motifs[:chunk_size])
+    print(f"GIL-releasing share of a batch: {share*100:.0f}% "
+          f"(Amdahl bound with the GIL: {1/(1-share):.1f}x)\n")
+    print(f"{'Threads':<8} {'Gen(keys/s)':<14} {'Speedup':<9} {'Verif(keys/s)':<15} {'Speedup':<9} {'All valid'}")
+    base_gen = base_ver = None
+    for threads in thread_counts:
+        with ORCPBatchExecutor(vertices=vertices, max_workers=threads, chunk_size=chunk_size) as executor:
+            start = time.perf_counter()
+            executor.generate_keys(motifs)
+            gen_rate = keys / (time.perf_counter() - start)
+            start = time.perf_counter()
+            valid = executor.verify(motifs, signatures)
+            ver_rate = keys / (time.perf_counter() - start)
+        base_gen = base_gen or gen_rate
+        base_ver = base_ver or ver_rate
+        print(f"{threads:<8} {gen_rate:<14,.0f} {gen_rate/base_gen:<9.2f} {ver_rate:<15,.0f} "
+              f"{ver_rate/base_ver:<9.2f} {all(valid)}")
+
+if __name__ == '__main__':
+    run_benchmark()